@@ -10,21 +10,11 @@ package_root = Path(__file__).parent.parent
 if str(package_root) not in sys.path:
     sys.path.insert(0, str(package_root))
 
-from quantconnect_mcp.src.server import mcp
-from quantconnect_mcp.src.tools import (
-    register_quantbook_tools,
-    register_data_tools,
-    register_analysis_tools,
-    register_portfolio_tools,
-    register_universe_tools,
-    register_auth_tools,
-    register_project_tools,
-    register_file_tools,
-    register_backtest_tools,
-)
+from quantconnect_mcp.src.server import mcp, serve
+from quantconnect_mcp.src.tools import register_toolsets
 from quantconnect_mcp.src.resources import register_system_resources
 from quantconnect_mcp.src.auth import configure_auth
-from quantconnect_mcp.src.utils import safe_print
+from quantconnect_mcp.src.utils import safe_print, run_event_loop
 
 
 def main():
@@ -46,17 +36,11 @@ def main():
                 "💡 You can configure authentication later using the configure_quantconnect_auth tool"
             )
 
-    # Register all tool modules
+    # Register tool modules; QUANTCONNECT_TOOLSETS limits this to a subset so
+    # unused toolsets (and their heavy imports) are never loaded
     safe_print("🔧 Registering QuantConnect tools...")
-    register_auth_tools(mcp)
-    register_project_tools(mcp)
-    register_file_tools(mcp)
-    register_backtest_tools(mcp)
-    register_quantbook_tools(mcp)
-    register_data_tools(mcp)
-    register_analysis_tools(mcp)
-    register_portfolio_tools(mcp)
-    register_universe_tools(mcp)
+    toolsets = register_toolsets(mcp, os.getenv("QUANTCONNECT_TOOLSETS"))
+    safe_print(f"   Toolsets: {', '.join(toolsets)}")
 
     # Register resources
     safe_print("📊 Registering system resources...")
@@ -71,18 +55,20 @@ def main():
         host = os.getenv("MCP_HOST", "0.0.0.0")
         port = int(os.getenv("MCP_PORT", os.getenv("PORT", "8000")))
         safe_print(f"🌐 Starting HTTP server on {host}:{port}")
-        mcp.run(
-            transport="streamable-http",
-            host=host,
-            port=port,
-            path=os.getenv("MCP_PATH", "/mcp"),
+        run_event_loop(
+            serve(
+                transport="streamable-http",
+                host=host,
+                port=port,
+                path=os.getenv("MCP_PATH", "/mcp"),
+            )
         )
     elif transport == "stdio":
         safe_print("📡 Starting STDIO transport")
-        mcp.run()  # Default stdio transport
+        run_event_loop(serve())  # Default stdio transport
     else:
         safe_print(f"🚀 Starting with {transport} transport")
-        mcp.run(transport=transport)
+        run_event_loop(serve(transport=transport))
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ from .quantconnect_auth import (
     get_auth_headers,
     validate_authentication,
     configure_auth,
+    close_auth,
     get_auth_instance,
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     "get_auth_headers",
     "validate_authentication",
     "configure_auth",
+    "close_auth",
     "get_auth_instance",
 ]
@@ -4,8 +4,40 @@ import os
 from base64 import b64encode
 from hashlib import sha256
 from time import time
-from typing import Dict, Optional, Tuple
+from typing import AsyncIterable, Dict, Optional, Tuple, Union
 import httpx
+import orjson
+
+
+# Pooled HTTP client shared by every auth instance
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for QuantConnect API requests.
+
+    Created on first use and reused afterwards, so requests share pooled
+    keep-alive connections instead of paying a TLS handshake each time.
+    HTTP/2 (via httpx[http2]) lets concurrent requests multiplex over one
+    connection.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+            timeout=30.0,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
 
 
 class QuantConnectAuth:
@@ -38,28 +70,52 @@ class QuantConnectAuth:
                 "environment variables or provide them directly."
             )
 
+        # Signing inputs are fixed per instance; encode them once
+        self._token_prefix = f"{self.api_token}:".encode("utf-8")
+        self._user_prefix = f"{self.user_id}:".encode("utf-8")
+        self._signed_headers: Optional[Tuple[int, Dict[str, str]]] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client for QuantConnect API requests."""
+        return get_client()
+
     def get_headers(self) -> Dict[str, str]:
         """
         Generate authenticated headers for QuantConnect API requests.
 
+        The signature only depends on the timestamp second, so headers are
+        signed once per second and reused by requests within it.
+
         Returns:
             Dictionary containing Authorization and Timestamp headers
         """
         # Get timestamp
-        timestamp = f"{int(time())}"
-        time_stamped_token = f"{self.api_token}:{timestamp}".encode("utf-8")
-
-        # Get hashed API token
-        hashed_token = sha256(time_stamped_token).hexdigest()
-        authentication = f"{self.user_id}:{hashed_token}".encode("utf-8")
-        authentication_encoded = b64encode(authentication).decode("ascii")
+        now = int(time())
+        signed = self._signed_headers
+        if signed is None or signed[0] != now:
+            timestamp = str(now)
+
+            # Get hashed API token
+            hashed_token = sha256(
+                self._token_prefix + timestamp.encode("ascii")
+            ).hexdigest()
+            authentication = self._user_prefix + hashed_token.encode("ascii")
+            authentication_encoded = b64encode(authentication).decode("ascii")
+
+            # Create headers dictionary
+            signed = (
+                now,
+                {
+                    "Authorization": f"Basic {authentication_encoded}",
+                    "Timestamp": timestamp,
+                    "Content-Type": "application/json",
+                },
+            )
+            self._signed_headers = signed
 
-        # Create headers dictionary
-        return {
-            "Authorization": f"Basic {authentication_encoded}",
-            "Timestamp": timestamp,
-            "Content-Type": "application/json",
-        }
+        # Copy so callers can't alter the cached headers
+        return dict(signed[1])
 
     async def validate_authentication(self) -> Tuple[bool, str]:
         """
@@ -69,24 +125,23 @@ class QuantConnectAuth:
             Tuple of (is_valid, message)
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}authenticate", headers=self.get_headers()
-                )
+            response = await self.client.post(
+                f"{self.base_url}authenticate", headers=self.get_headers()
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("success", False):
-                        return True, "Authentication successful"
-                    else:
-                        return False, "Authentication failed: Invalid response"
-                elif response.status_code == 401:
-                    return (
-                        False,
-                        "Authentication failed: Invalid credentials or expired timestamp",
-                    )
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("success", False):
+                    return True, "Authentication successful"
                 else:
-                    return False, f"Authentication failed: HTTP {response.status_code}"
+                    return False, "Authentication failed: Invalid response"
+            elif response.status_code == 401:
+                return (
+                    False,
+                    "Authentication failed: Invalid credentials or expired timestamp",
+                )
+            else:
+                return False, f"Authentication failed: HTTP {response.status_code}"
 
         except Exception as e:
             return False, f"Authentication error: {str(e)}"
@@ -97,6 +152,7 @@ class QuantConnectAuth:
         method: str = "GET",
         data: Optional[Dict] = None,
         json: Optional[Dict] = None,
+        content: Optional[Union[bytes, AsyncIterable[bytes]]] = None,
     ) -> httpx.Response:
         """
         Make an authenticated request to QuantConnect API.
@@ -105,31 +161,41 @@ class QuantConnectAuth:
             endpoint: API endpoint (without base URL)
             method: HTTP method (GET, POST, PUT, DELETE)
             data: Form data for the request
-            json: JSON data for the request
+            json: JSON data for the request, serialized with orjson
+            content: Pre-encoded JSON body, or an async iterable of chunks to
+                     stream, used instead of json for large payloads
 
         Returns:
             HTTP response object
         """
-        async with httpx.AsyncClient() as client:
-            url = f"{self.base_url}{endpoint.lstrip('/')}"
-            headers = self.get_headers()
-
-            if method.upper() == "GET":
-                return await client.get(url, headers=headers)
-            elif method.upper() == "POST":
-                if json is not None:
-                    return await client.post(url, headers=headers, json=json)
-                else:
-                    return await client.post(url, headers=headers, data=data or {})
-            elif method.upper() == "PUT":
-                if json is not None:
-                    return await client.put(url, headers=headers, json=json)
-                else:
-                    return await client.put(url, headers=headers, data=data or {})
-            elif method.upper() == "DELETE":
-                return await client.delete(url, headers=headers)
+        client = self.client
+        url = f"{self.base_url}{endpoint.lstrip('/')}"
+        headers = self.get_headers()
+
+        if method.upper() == "GET":
+            return await client.get(url, headers=headers)
+        elif method.upper() == "POST":
+            if content is not None:
+                return await client.post(url, headers=headers, content=content)
+            elif json is not None:
+                return await client.post(
+                    url, headers=headers, content=orjson.dumps(json)
+                )
+            else:
+                return await client.post(url, headers=headers, data=data or {})
+        elif method.upper() == "PUT":
+            if content is not None:
+                return await client.put(url, headers=headers, content=content)
+            elif json is not None:
+                return await client.put(
+                    url, headers=headers, content=orjson.dumps(json)
+                )
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                return await client.put(url, headers=headers, data=data or {})
+        elif method.upper() == "DELETE":
+            return await client.delete(url, headers=headers)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
 
 # Global authentication instance
@@ -176,6 +242,13 @@ def configure_auth(
     return _auth_instance
 
 
+async def close_auth() -> None:
+    """Clear the global authentication instance and close the shared HTTP client."""
+    global _auth_instance
+    _auth_instance = None
+    await close_client()
+
+
 def get_auth_instance() -> Optional[QuantConnectAuth]:
     """Get the global authentication instance."""
     return _auth_instance
@@ -1,16 +1,76 @@
-"""QuantConnect MCP Tools Package"""
-
-from .quantbook_tools import register_quantbook_tools
-from .data_tools import register_data_tools
-from .analysis_tools import register_analysis_tools
-from .portfolio_tools import register_portfolio_tools
-from .universe_tools import register_universe_tools
-from .auth_tools import register_auth_tools
-from .project_tools import register_project_tools
-from .file_tools import register_file_tools
-from .backtest_tools import register_backtest_tools
+"""QuantConnect MCP Tools Package
+
+Tool modules are imported on first use, so a server that only registers a few
+toolsets never pays for the pandas/numpy imports of the research tools.
+"""
+
+from importlib import import_module
+from typing import Any, List, Optional
+
+# Toolset name -> (module, register function)
+TOOLSETS = {
+    "auth": ("auth_tools", "register_auth_tools"),
+    "project": ("project_tools", "register_project_tools"),
+    "file": ("file_tools", "register_file_tools"),
+    "backtest": ("backtest_tools", "register_backtest_tools"),
+    "quantbook": ("quantbook_tools", "register_quantbook_tools"),
+    "data": ("data_tools", "register_data_tools"),
+    "analysis": ("analysis_tools", "register_analysis_tools"),
+    "portfolio": ("portfolio_tools", "register_portfolio_tools"),
+    "universe": ("universe_tools", "register_universe_tools"),
+}
+
+_REGISTER_FUNCTIONS = {name: module for module, name in TOOLSETS.values()}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a tool module the first time its register function is accessed."""
+    module = _REGISTER_FUNCTIONS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    register = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = register
+    return register
+
+
+def register_toolsets(mcp: Any, toolsets: Optional[str] = None) -> List[str]:
+    """
+    Register the selected toolsets with the MCP server.
+
+    Args:
+        mcp: FastMCP server instance
+        toolsets: Comma-separated toolset names (e.g. "auth,project,file").
+                  Registers every toolset if not provided.
+
+    Returns:
+        Names of the registered toolsets
+
+    Raises:
+        ValueError: If an unknown toolset name is given
+    """
+    if toolsets:
+        # Drop repeated names, keeping first-seen order, so no toolset registers twice
+        selected = list(
+            dict.fromkeys(name.strip() for name in toolsets.split(",") if name.strip())
+        )
+        unknown = [name for name in selected if name not in TOOLSETS]
+        if unknown:
+            raise ValueError(
+                f"Unknown toolsets {unknown}. Must be one of: {list(TOOLSETS)}"
+            )
+    else:
+        selected = list(TOOLSETS)
+
+    for name in selected:
+        __getattr__(TOOLSETS[name][1])(mcp)
+
+    return selected
+
 
 __all__ = [
+    "TOOLSETS",
+    "register_toolsets",
     "register_quantbook_tools",
     "register_data_tools",
     "register_analysis_tools",
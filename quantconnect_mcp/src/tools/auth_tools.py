@@ -2,7 +2,7 @@
 
 from fastmcp import FastMCP
 from typing import Dict, Any, Optional
-from ..auth import QuantConnectAuth, configure_auth, validate_authentication, get_auth_instance  # type: ignore
+from ..auth import QuantConnectAuth, configure_auth, close_auth, validate_authentication, get_auth_instance  # type: ignore
 
 
 def register_auth_tools(mcp: FastMCP):
@@ -193,10 +193,8 @@ def register_auth_tools(mcp: FastMCP):
             Dictionary containing operation status
         """
         try:
-            from ..auth import quantconnect_auth  # type: ignore
-
-            # Clear the auth instance
-            quantconnect_auth._auth_instance = None
+            # Clear the auth instance and close its HTTP client
+            await close_auth()
 
             return {
                 "status": "success",
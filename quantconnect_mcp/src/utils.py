@@ -1,10 +1,14 @@
 """Utility functions for QuantConnect MCP Server"""
 
 import sys
+import asyncio
 import logging
+from typing import Any, Coroutine, TypeVar
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 def safe_print(text):
     """Print text safely, handling emojis and MCP server context.
@@ -22,4 +26,31 @@ def safe_print(text):
     try:
         print(text, file=sys.stderr)
     except UnicodeEncodeError:
-        print(text.encode('ascii', errors='replace').decode(), file=sys.stderr)
\ No newline at end of file
+        print(text.encode('ascii', errors='replace').decode(), file=sys.stderr)
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create a uvloop event loop when available, else a default asyncio loop."""
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        return asyncio.new_event_loop()
+
+    return uvloop.new_event_loop()
+
+
+def run_event_loop(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on a new event loop.
+
+    The loop uses uvloop when available and the eager task factory, so tasks
+    that finish without awaiting I/O (e.g. cache hits) skip a scheduler round-trip.
+
+    Args:
+        main: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        runner.get_loop().set_task_factory(asyncio.eager_task_factory)
+        return runner.run(main)
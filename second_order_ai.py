@@ -4,22 +4,82 @@ Integrates Perplexity Sonar and Claude for advanced market analysis
 """
 
 import os
-import json
 import asyncio
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from hashlib import blake2b
 import httpx
+import numpy as np
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+from quantconnect_mcp.src.utils import run_event_loop
+
 load_dotenv()
 
+# Strategy by (tier * 2 + is_pairs_relationship): high confidence and short lag
+# wins, then moderate confidence, then the relationship decides
+_STRATEGY_TABLE = (
+    'OPTIONS_SPREAD', 'PAIRS_TRADE',
+    'OPTIONS_DIRECTIONAL', 'OPTIONS_DIRECTIONAL',
+    'DIRECT_EQUITY', 'DIRECT_EQUITY',
+)
+_PAIRS_RELATIONSHIPS = frozenset({'competitor', 'inverse'})
+
+# Static parts of the LLM requests; only the user message changes per call
+_PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+_PERPLEXITY_REQUEST = {"model": "sonar-pro"}
+_PERPLEXITY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a financial analyst. Always return valid JSON."
+}
+
+_CLAUDE_URL = "https://api.anthropic.com/v1/messages"
+_CLAUDE_REQUEST = {"model": "claude-3-5-sonnet-20241022", "max_tokens": 4000}
+
+def _consume_exception(request: asyncio.Future) -> None:
+    """Mark a shared request's failure as handled even if every caller gave up on it"""
+    if not request.cancelled():
+        request.exception()
+
 class SecondOrderAI:
     """AI system for detecting and analyzing second-order market effects"""
     
     def __init__(self):
         self.perplexity_key = os.getenv("PERPLEXITY_API_KEY")
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-        self.cache = {}  # Simple cache for API responses
+        self._perplexity_headers = {
+            "Authorization": f"Bearer {self.perplexity_key}",
+            "Content-Type": "application/json"
+        }
+        self._claude_headers = {
+            "x-api-key": self.anthropic_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json"
+        }
+        self.cache = TTLCache(maxsize=1024, ttl=300)  # Parsed API responses (read-only), 5 min TTL
+        self._in_flight: Dict[str, asyncio.Future] = {}  # Shared requests awaiting a response
+        
+        # Per-provider concurrency limits, kept under the rate limits to avoid 429 retries
+        self._perplexity_limit = asyncio.Semaphore(8)
+        self._claude_limit = asyncio.Semaphore(4)
+        
+        # Shared client so both providers reuse pooled keep-alive connections
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=30.0,
+            http2=True,
+        )
+        
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self._client.aclose()
         
     async def detect_primary_event(self, news_items: List[Dict]) -> Dict:
         """Use Perplexity to identify primary market-moving events"""
@@ -27,7 +87,7 @@ class SecondOrderAI:
         prompt = f"""Analyze these recent market news items and identify the PRIMARY market-moving event.
         
 News items:
-{json.dumps(news_items, indent=2)}
+{orjson.dumps(news_items, option=orjson.OPT_INDENT_2).decode()}
 
 Identify:
 1. The most significant market-moving event
@@ -46,8 +106,7 @@ Return as JSON:
     "timestamp": "2024-XX-XX"
 }}"""
         
-        response = await self._query_perplexity(prompt)
-        return json.loads(response)
+        return await self._query_perplexity(prompt)
     
     async def map_second_order_effects(self, primary_event: Dict) -> Dict:
         """Use Claude to map comprehensive second-order effects"""
@@ -55,7 +114,7 @@ Return as JSON:
         prompt = f"""You are an expert market analyst specializing in identifying second-order effects.
 
 Primary Event:
-{json.dumps(primary_event, indent=2)}
+{orjson.dumps(primary_event, option=orjson.OPT_INDENT_2).decode()}
 
 Analyze and identify ALL second-order effects:
 
@@ -97,8 +156,7 @@ For each affected entity, provide:
 
 Return as JSON with all affected entities grouped by category."""
         
-        response = await self._query_claude(prompt)
-        return json.loads(response)
+        return await self._query_claude(prompt)
     
     async def analyze_options_flow(self, ticker: str, related_tickers: List[str]) -> Dict:
         """Analyze options flow for unusual activity in second-order names"""
@@ -122,137 +180,172 @@ Consider:
 
 Return structured strategies for each ticker."""
         
-        response = await self._query_claude(prompt)
-        return json.loads(response)
+        return await self._query_claude(prompt)
+    
+    async def analyze(self, news_items: List[Dict]) -> Dict:
+        """Run the full pipeline, overlapping the independent Claude calls"""
+        
+        primary_event = await self.detect_primary_event(news_items)
+        
+        # Effects mapping and options analysis only depend on the primary event;
+        # if one fails the other is cancelled
+        async with asyncio.TaskGroup() as tg:
+            map_task = tg.create_task(self.map_second_order_effects(primary_event))
+            options_task = tg.create_task(
+                self.analyze_options_flow(primary_event['primary_ticker'], [])
+            )
+        
+        second_order_map = map_task.result()
+        return {
+            'primary_event': primary_event,
+            'second_order_map': second_order_map,
+            'options_flow': options_task.result(),
+            'signals': await self.generate_trade_signals(second_order_map)
+        }
+    
+    async def detect_primary_events(self, news_batches: List[List[Dict]]) -> List[Dict]:
+        """Detect the primary event for several news batches concurrently"""
+        
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self.detect_primary_event(news_items)) for news_items in news_batches]
+        
+        return [task.result() for task in tasks]
     
     async def generate_trade_signals(self, second_order_map: Dict) -> List[Dict]:
         """Generate specific trade signals from second-order analysis"""
         
+        entities = [entity for entities in second_order_map.values() for entity in entities]
+        entities = [entity for entity in entities if entity['confidence'] > 0.6]  # Confidence threshold
+        if not entities:
+            return []
+        
+        count = len(entities)
+        confidence = np.fromiter((e['confidence'] for e in entities), float, count)
+        magnitude = np.fromiter((e['impact_magnitude'] for e in entities), float, count)
+        lag = np.fromiter((e['time_lag_days'] for e in entities), float, count)
+        pairs = np.fromiter((e['relationship'] in _PAIRS_RELATIONSHIPS for e in entities), bool, count)
+        
+        size_multiplier = confidence * magnitude
+        
+        # Top 10 by size; the stable sort keeps original order among ties
+        top = np.argsort(-size_multiplier, kind='stable')[:10]
+        
+        # Same rules as _STRATEGY_TABLE, stops and targets for all selected entities at once
+        confidence, magnitude, lag, pairs = confidence[top], magnitude[top], lag[top], pairs[top]
+        tier = ((confidence > 0.8) & (lag < 5)).astype(int) + ((confidence > 0.7) & (lag < 10))
+        strategies = (tier * 2 + pairs).tolist()
+        stop_loss = np.where(confidence > 0.8, 0.05, 0.03).tolist()
+        take_profit = np.where(magnitude > 0.7, 0.1, 0.07).tolist()
+        
         signals = []
+        for i, index in enumerate(top.tolist()):
+            entity = entities[index]
+            signals.append({
+                'ticker': entity['ticker'],
+                'action': 'BUY' if entity['impact_direction'] == 'positive' else 'SELL',
+                'strategy': _STRATEGY_TABLE[strategies[i]],
+                'size_multiplier': entity['confidence'] * entity['impact_magnitude'],
+                'time_horizon': entity['time_lag_days'],
+                'stop_loss': stop_loss[i],
+                'take_profit': take_profit[i],
+                'rationale': entity['rationale']
+            })
         
-        for category, entities in second_order_map.items():
-            for entity in entities:
-                if entity['confidence'] > 0.6:  # Confidence threshold
-                    signal = {
-                        'ticker': entity['ticker'],
-                        'action': 'BUY' if entity['impact_direction'] == 'positive' else 'SELL',
-                        'strategy': self._determine_strategy(entity),
-                        'size_multiplier': entity['confidence'] * entity['impact_magnitude'],
-                        'time_horizon': entity['time_lag_days'],
-                        'stop_loss': 0.05 if entity['confidence'] > 0.8 else 0.03,
-                        'take_profit': 0.1 if entity['impact_magnitude'] > 0.7 else 0.07,
-                        'rationale': entity['rationale']
-                    }
-                    signals.append(signal)
-        
-        return sorted(signals, key=lambda x: x['size_multiplier'], reverse=True)[:10]
-    
-    def _determine_strategy(self, entity: Dict) -> str:
-        """Determine optimal trading strategy based on characteristics"""
-        
-        if entity['confidence'] > 0.8 and entity['time_lag_days'] < 5:
-            return 'DIRECT_EQUITY'
-        elif entity['confidence'] > 0.7 and entity['time_lag_days'] < 10:
-            return 'OPTIONS_DIRECTIONAL'
-        elif entity['relationship'] in ['competitor', 'inverse']:
-            return 'PAIRS_TRADE'
-        else:
-            return 'OPTIONS_SPREAD'
+        return signals
     
-    async def _query_perplexity(self, prompt: str) -> str:
+    async def _query_perplexity(self, prompt: str) -> Dict:
         """Query Perplexity Sonar Pro"""
         
+        cache_key = blake2b(f"perplexity:{prompt}".encode(), digest_size=16).hexdigest()
+        return await self._cached_query(cache_key, self._fetch_perplexity, prompt)
+    
+    async def _query_claude(self, prompt: str) -> Dict:
+        """Query Claude 3.5 Sonnet"""
+        
+        cache_key = blake2b(f"claude:{prompt}".encode(), digest_size=16).hexdigest()
+        return await self._cached_query(cache_key, self._fetch_claude, prompt)
+    
+    async def _cached_query(self, cache_key: str, fetch: Callable[[str], Awaitable[Dict]], prompt: str) -> Dict:
+        """Serve from cache, or share a single in-flight request between identical callers
+        
+        The parsed dict is cached and handed to every caller as is, so results
+        are shared and must be treated as read-only.
+        """
+        
         # Check cache
-        cache_key = f"perplexity_{hash(prompt)}"
-        if cache_key in self.cache:
-            if (datetime.now() - self.cache[cache_key]['timestamp']).seconds < 300:
-                return self.cache[cache_key]['response']
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        url = "https://api.perplexity.ai/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.perplexity_key}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": "sonar-pro",
-            "messages": [
-                {"role": "system", "content": "You are a financial analyst. Always return valid JSON."},
-                {"role": "user", "content": prompt}
-            ]
-        }
+        # Join the request already asking this exact prompt, or start one
+        request = self._in_flight.get(cache_key)
+        if request is None:
+            request = asyncio.ensure_future(self._fetch_and_cache(cache_key, fetch, prompt))
+            request.add_done_callback(_consume_exception)
+            if not request.done():
+                self._in_flight[cache_key] = request
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data, timeout=30)
-            result = response.json()["choices"][0]["message"]["content"]
-            
-            # Cache response
-            self.cache[cache_key] = {
-                'response': result,
-                'timestamp': datetime.now()
-            }
-            
-            return result
+        # Shielded so cancelling one caller doesn't cancel the request for the rest
+        return await asyncio.shield(request)
     
-    async def _query_claude(self, prompt: str) -> str:
-        """Query Claude 3.5 Sonnet"""
+    async def _fetch_and_cache(self, cache_key: str, fetch: Callable[[str], Awaitable[Dict]], prompt: str) -> Dict:
+        """Run a shared request and cache its parsed response"""
         
-        # Check cache
-        cache_key = f"claude_{hash(prompt)}"
-        if cache_key in self.cache:
-            if (datetime.now() - self.cache[cache_key]['timestamp']).seconds < 300:
-                return self.cache[cache_key]['response']
+        try:
+            result = await fetch(prompt)
+        finally:
+            self._in_flight.pop(cache_key, None)
+        
+        # Cache response
+        self.cache[cache_key] = result
+        return result
+    
+    async def _fetch_perplexity(self, prompt: str) -> Dict:
+        """Send a prompt to Perplexity and parse its JSON answer, bypassing the cache"""
         
-        url = "https://api.anthropic.com/v1/messages"
-        headers = {
-            "x-api-key": self.anthropic_key,
-            "anthropic-version": "2023-06-01",
-            "Content-Type": "application/json"
-        }
         data = {
-            "model": "claude-3-5-sonnet-20241022",
-            "max_tokens": 4000,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
+            **_PERPLEXITY_REQUEST,
+            "messages": [_PERPLEXITY_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=data, timeout=30)
-            result = response.json()["content"][0]["text"]
-            
-            # Cache response
-            self.cache[cache_key] = {
-                'response': result,
-                'timestamp': datetime.now()
-            }
-            
-            return result
+        async with self._perplexity_limit:
+            response = await self._client.post(
+                _PERPLEXITY_URL, headers=self._perplexity_headers, content=orjson.dumps(data)
+            )
+        payload = orjson.loads(response.content)
+        return orjson.loads(payload["choices"][0]["message"]["content"])
+    
+    async def _fetch_claude(self, prompt: str) -> Dict:
+        """Send a prompt to Claude and parse its JSON answer, bypassing the cache"""
+        
+        data = {**_CLAUDE_REQUEST, "messages": [{"role": "user", "content": prompt}]}
+        
+        async with self._claude_limit:
+            response = await self._client.post(
+                _CLAUDE_URL, headers=self._claude_headers, content=orjson.dumps(data)
+            )
+        payload = orjson.loads(response.content)
+        return orjson.loads(payload["content"][0]["text"])
 
 
 # Example usage
 async def main():
-    ai = SecondOrderAI()
-    
-    # Example news items
-    news = [
-        {
-            "headline": "NVIDIA Reports Record Data Center Revenue, Raises Guidance",
-            "timestamp": "2024-11-20T16:00:00Z",
-            "source": "Reuters"
-        }
-    ]
-    
-    # Detect primary event
-    primary_event = await ai.detect_primary_event(news)
-    print(f"Primary Event: {json.dumps(primary_event, indent=2)}")
-    
-    # Map second-order effects
-    second_order_map = await ai.map_second_order_effects(primary_event)
-    print(f"\nSecond-Order Effects: {json.dumps(second_order_map, indent=2)}")
-    
-    # Generate trade signals
-    signals = await ai.generate_trade_signals(second_order_map)
-    print(f"\nTrade Signals: {json.dumps(signals, indent=2)}")
+    async with SecondOrderAI() as ai:
+        # Example news items
+        news = [
+            {
+                "headline": "NVIDIA Reports Record Data Center Revenue, Raises Guidance",
+                "timestamp": "2024-11-20T16:00:00Z",
+                "source": "Reuters"
+            }
+        ]
+        
+        # Detect primary event, then map effects and options flow in parallel
+        result = await ai.analyze(news)
+        print(f"Primary Event: {orjson.dumps(result['primary_event'], option=orjson.OPT_INDENT_2).decode()}")
+        print(f"\nSecond-Order Effects: {orjson.dumps(result['second_order_map'], option=orjson.OPT_INDENT_2).decode()}")
+        print(f"\nOptions Flow: {orjson.dumps(result['options_flow'], option=orjson.OPT_INDENT_2).decode()}")
+        print(f"\nTrade Signals: {orjson.dumps(result['signals'], option=orjson.OPT_INDENT_2).decode()}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_event_loop(main())
@@ -5,6 +5,22 @@ from AlgorithmImports import *
 from datetime import timedelta
 import json
 
+# Direction a related stock moves relative to the primary, by relationship
+RELATION_SIGNS = {"competitors": -1}
+
+# Intraday trade confidence (primary rally, primary decline) by relationship;
+# relationships not listed are not traded on intraday moves
+INTRADAY_CONFIDENCE = {
+    "suppliers": (0.7, 0.6),
+    "competitors": (0.5, 0.4)
+}
+
+# Trade reason (primary rally, primary decline) for the traded relationships
+INTRADAY_REASONS = {
+    "suppliers": ("rally benefits supplier", "decline hurts supplier"),
+    "competitors": ("rally hurts competitor", "decline helps competitor")
+}
+
 class SecondOrderEffectsAlgorithm(QCAlgorithm):
     
     def Initialize(self):
@@ -39,15 +55,29 @@ class SecondOrderEffectsAlgorithm(QCAlgorithm):
         # Track primary movers
         self.primary_movers = ["AAPL", "TSLA", "NVDA", "MSFT", "AMZN"]
         
+        # Preallocated arrays so OnData can scan all movers with one vector compare
+        self.mover_tickers = np.array(self.primary_movers, dtype=object)
+        self.mover_returns = np.zeros(len(self.primary_movers))
+        
         # Add primary securities
         for ticker in self.primary_movers:
             self.AddEquity(ticker, Resolution.Minute)
         
+        # Flatten each supply chain once into parallel arrays:
+        # related tickers, relationship, direction sign, intraday confidence
+        self.chain_index = {}
+        for primary, chain in self.supply_chains.items():
+            tickers = [ticker for tickers in chain.values() for ticker in tickers]
+            relations = [relation for relation, tickers in chain.items() for _ in tickers]
+            self.chain_index[primary] = (
+                np.array(tickers, dtype=object),
+                np.array(relations, dtype=object),
+                np.array([RELATION_SIGNS.get(r, 1) for r in relations]),
+                np.array([INTRADAY_CONFIDENCE.get(r, (0.0, 0.0)) for r in relations])
+            )
+        
         # Add all related securities
-        all_related = set()
-        for chain in self.supply_chains.values():
-            for category in chain.values():
-                all_related.update(category)
+        all_related = set(np.concatenate([index[0] for index in self.chain_index.values()]))
         
         for ticker in all_related:
             try:
@@ -74,95 +104,68 @@ class SecondOrderEffectsAlgorithm(QCAlgorithm):
     def OnData(self, data):
         """Process incoming data and look for primary events"""
         
-        # Detect significant moves in primary stocks
-        for symbol in self.primary_movers:
-            if symbol not in data:
-                continue
-                
-            # Check for significant price movement (> 5% intraday)
+        # Gather unrealized returns of primary stocks with a bar in this slice
+        for i, symbol in enumerate(self.primary_movers):
             if symbol in data.Bars:
-                current_price = data[symbol].Close
-                daily_return = self.Securities[symbol].Holdings.UnrealizedProfitPercent
-                
-                # Detect primary event (simplified - would use news in production)
-                if abs(daily_return) > 0.05:
-                    self.Debug(f"Primary event detected: {symbol} moved {daily_return:.2%}")
-                    self.TriggerSecondOrderTrades(symbol, daily_return, data)
+                self.mover_returns[i] = float(self.Securities[symbol].Holdings.UnrealizedProfitPercent)
+            else:
+                self.mover_returns[i] = 0.0
+        
+        # Detect primary events: significant price movement (> 5% intraday)
+        # (simplified - would use news in production)
+        for i in np.flatnonzero(np.abs(self.mover_returns) > 0.05):
+            symbol = self.mover_tickers[i]
+            daily_return = self.mover_returns[i]
+            self.Debug(f"Primary event detected: {symbol} moved {daily_return:.2%}")
+            self.TriggerSecondOrderTrades(symbol, daily_return, data)
     
     def DetectSecondOrderEffects(self):
         """Scheduled function to analyze market for second-order opportunities"""
         
         # Get recent performance of primary movers
-        history = self.History(self.primary_movers, 5, Resolution.Daily)
-        
-        if history.empty:
+        try:
+            history = self.History(self.primary_movers, 5, Resolution.Daily)
+            if history.empty:
+                return
+            
+            # One column of closes per symbol, padded so the first/last rows hold
+            # each symbol's first/last close
+            closes = history['close'].unstack(level=0).bfill().ffill()
+        except:
             return
         
-        # Find significant movers
-        for symbol in self.primary_movers:
-            try:
-                symbol_data = history.loc[symbol]
-                returns = symbol_data['close'].pct_change()
-                
-                # If 5-day return > 10%, significant event
-                five_day_return = (symbol_data['close'].iloc[-1] / symbol_data['close'].iloc[0]) - 1
-                
-                if abs(five_day_return) > 0.10:
-                    self.Debug(f"Multi-day event: {symbol} moved {five_day_return:.2%} over 5 days")
-                    self.AnalyzeSecondOrderOpportunities(symbol, five_day_return)
-            except:
-                continue
+        tickers = [getattr(symbol, "Value", symbol) for symbol in closes.columns]
+        prices = closes.to_numpy()
+        five_day_returns = prices[-1] / prices[0] - 1.0
+        
+        # If 5-day return > 10%, significant event
+        for i in np.flatnonzero(np.abs(five_day_returns) > 0.10):
+            symbol = tickers[i]
+            five_day_return = five_day_returns[i]
+            self.Debug(f"Multi-day event: {symbol} moved {five_day_return:.2%} over 5 days")
+            self.AnalyzeSecondOrderOpportunities(symbol, five_day_return)
     
     def TriggerSecondOrderTrades(self, primary_symbol, primary_move, data):
         """Execute second-order trades based on primary event"""
         
-        if primary_symbol not in self.supply_chains:
+        if primary_symbol not in self.chain_index:
             return
         
-        chain = self.supply_chains[primary_symbol]
-        
-        # Logic for second-order effects
-        if primary_move > 0:  # Primary stock up
-            # Suppliers benefit
-            for supplier in chain.get("suppliers", []):
-                if data.ContainsKey(supplier):
-                    self.ExecuteSecondOrderTrade(
-                        supplier, 
-                        "LONG", 
-                        f"{primary_symbol} rally benefits supplier",
-                        confidence=0.7
-                    )
-            
-            # Competitors might suffer
-            for competitor in chain.get("competitors", []):
-                if data.ContainsKey(competitor):
-                    self.ExecuteSecondOrderTrade(
-                        competitor,
-                        "SHORT",
-                        f"{primary_symbol} rally hurts competitor",
-                        confidence=0.5
-                    )
-        
-        else:  # Primary stock down
-            # Suppliers suffer
-            for supplier in chain.get("suppliers", []):
-                if data.ContainsKey(supplier):
-                    self.ExecuteSecondOrderTrade(
-                        supplier,
-                        "SHORT", 
-                        f"{primary_symbol} decline hurts supplier",
-                        confidence=0.6
-                    )
-            
-            # Some competitors might benefit
-            for competitor in chain.get("competitors", []):
-                if data.ContainsKey(competitor):
-                    self.ExecuteSecondOrderTrade(
-                        competitor,
-                        "LONG",
-                        f"{primary_symbol} decline helps competitor",
-                        confidence=0.4
-                    )
+        tickers, relations, signs, confidence = self.chain_index[primary_symbol]
+        
+        # Suppliers follow the primary, competitors move against it
+        rally = primary_move > 0
+        directions = signs if rally else -signs
+        column = 0 if rally else 1
+        
+        for ticker, relation, direction, conf in zip(tickers, relations, directions, confidence[:, column]):
+            if conf > 0 and data.ContainsKey(ticker):
+                self.ExecuteSecondOrderTrade(
+                    ticker,
+                    "LONG" if direction > 0 else "SHORT",
+                    f"{primary_symbol} {INTRADAY_REASONS[relation][column]}",
+                    confidence=float(conf)
+                )
     
     def ExecuteSecondOrderTrade(self, symbol, direction, reason, confidence=0.5):
         """Execute a second-order effect trade with appropriate sizing"""
@@ -208,41 +211,43 @@ class SecondOrderEffectsAlgorithm(QCAlgorithm):
     def AnalyzeSecondOrderOpportunities(self, primary_symbol, multi_day_return):
         """Analyze longer-term second-order opportunities"""
         
-        if primary_symbol not in self.supply_chains:
+        if primary_symbol not in self.chain_index:
+            return
+        
+        tickers, relations, signs, _ = self.chain_index[primary_symbol]
+        
+        # Recent performance of every related stock in a single request
+        try:
+            history = self.History(list(tickers), 20, Resolution.Daily)
+        except:
             return
         
-        chain = self.supply_chains[primary_symbol]
+        if history.empty:
+            return
+        
+        primary_sign = 1 if multi_day_return > 0 else -1
         
         # Look for lagging related stocks
-        for category, tickers in chain.items():
-            for ticker in tickers:
-                try:
-                    # Get correlation and recent performance
-                    ticker_history = self.History([ticker], 20, Resolution.Daily)
-                    if ticker_history.empty:
-                        continue
-                    
-                    ticker_return = (ticker_history['close'].iloc[-1] / ticker_history['close'].iloc[-5]) - 1
-                    
-                    # If primary moved significantly but related hasn't, opportunity exists
-                    return_differential = abs(multi_day_return) - abs(ticker_return)
-                    
-                    if return_differential > 0.05:  # 5% differential
-                        direction = "LONG" if multi_day_return > 0 else "SHORT"
-                        
-                        # Adjust for category
-                        if category == "competitors":
-                            direction = "SHORT" if direction == "LONG" else "LONG"
-                        
-                        self.ExecuteSecondOrderTrade(
-                            ticker,
-                            direction,
-                            f"Lagging {category} to {primary_symbol}",
-                            confidence=0.6
-                        )
+        for ticker, relation, sign in zip(tickers, relations, signs):
+            try:
+                closes = history.loc[ticker]['close']
+                ticker_return = (closes.iloc[-1] / closes.iloc[-5]) - 1
+            except:
+                continue
+            
+            # If primary moved significantly but related hasn't, opportunity exists
+            return_differential = abs(multi_day_return) - abs(ticker_return)
+            
+            if return_differential > 0.05:  # 5% differential
+                # Competitors are traded against the primary's direction
+                direction = "LONG" if primary_sign * sign > 0 else "SHORT"
                 
-                except:
-                    continue
+                self.ExecuteSecondOrderTrade(
+                    ticker,
+                    direction,
+                    f"Lagging {relation} to {primary_symbol}",
+                    confidence=0.6
+                )
     
     def OnEndOfDay(self, symbol):
         """End of day cleanup and position management"""
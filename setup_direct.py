@@ -3,11 +3,14 @@
 Direct QuantConnect API setup for Second-Order Effects Trading System
 """
 
+import asyncio
+import aiofiles
 import httpx
 import json
 import time
 from hashlib import sha256
 from base64 import b64encode
+from functools import lru_cache
 
 # Your credentials
 USER_ID = "388061"
@@ -17,7 +20,12 @@ BASE_URL = "https://www.quantconnect.com/api/v2/"
 
 def get_auth_headers():
     """Generate authenticated headers for QuantConnect API"""
-    timestamp = str(int(time.time()))
+    # Callers add their own headers, so hand out a copy of the cached ones
+    return dict(_headers_for(int(time.time())))
+
+@lru_cache(maxsize=2)
+def _headers_for(timestamp):
+    """Sign a timestamp; the result is valid for that whole second"""
     time_stamped_token = f"{API_TOKEN}:{timestamp}".encode("utf-8")
     hashed_token = sha256(time_stamped_token).hexdigest()
     authentication = f"{USER_ID}:{hashed_token}"
@@ -25,10 +33,10 @@ def get_auth_headers():
     
     return {
         "Authorization": f"Basic {encoded_auth}",
-        "Timestamp": timestamp
+        "Timestamp": str(timestamp)
     }
 
-def create_project(name, language="Py"):
+async def create_project(client, name, language="Py"):
     """Create a new QuantConnect project"""
     url = f"{BASE_URL}projects/create"
     headers = get_auth_headers()
@@ -40,10 +48,10 @@ def create_project(name, language="Py"):
         "organizationId": ORGANIZATION_ID
     }
     
-    response = httpx.post(url, headers=headers, json=data)
+    response = await client.post(url, headers=headers, json=data)
     return response.json()
 
-def create_file(project_id, filename, content):
+async def create_file(client, project_id, filename, content):
     """Create a file in the project"""
     url = f"{BASE_URL}files/create"
     headers = get_auth_headers()
@@ -55,10 +63,17 @@ def create_file(project_id, filename, content):
         "content": content
     }
     
-    response = httpx.post(url, headers=headers, json=data)
+    response = await client.post(url, headers=headers, json=data)
     return response.json()
 
-def compile_project(project_id):
+async def upload_file(client, project_id, filename, path):
+    """Read a local file and create it in the project"""
+    async with aiofiles.open(path, 'r') as f:
+        content = await f.read()
+    
+    return await create_file(client, project_id, filename, content)
+
+async def compile_project(client, project_id):
     """Compile the project"""
     url = f"{BASE_URL}compile/create"
     headers = get_auth_headers()
@@ -66,51 +81,55 @@ def compile_project(project_id):
     
     data = {"projectId": project_id}
     
-    response = httpx.post(url, headers=headers, json=data)
+    response = await client.post(url, headers=headers, json=data)
     return response.json()
 
-def main():
+async def main():
     print("🚀 Setting up Second-Order Effects Trading System in QuantConnect\n")
     
-    # Step 1: Create project
-    print("1️⃣ Creating project...")
-    project_name = "SecondOrderEffectsEngine"
-    
-    result = create_project(project_name)
-    
-    if result.get('success'):
-        project_id = result['projects'][0]['projectId']
-        print(f"   ✅ Project created: {project_name} (ID: {project_id})\n")
-    else:
-        print(f"   ❌ Error: {result.get('errors', result)}")
-        return
-    
-    # Step 2: Read and upload the algorithm
-    print("2️⃣ Uploading algorithm...")
-    
-    with open('second_order_algo.py', 'r') as f:
-        algo_content = f.read()
-    
-    file_result = create_file(project_id, "main.py", algo_content)
-    
-    if file_result.get('success'):
-        print(f"   ✅ Algorithm uploaded successfully!\n")
-    else:
-        print(f"   ❌ Error: {file_result}")
-    
-    # Step 3: Compile
-    print("3️⃣ Compiling project...")
-    compile_result = compile_project(project_id)
-    
-    if compile_result.get('success'):
-        print(f"   ✅ Compilation successful!\n")
-        print(f"   Compile ID: {compile_result.get('compileId')}")
-    else:
-        print(f"   ⚠️ Compilation issues: {compile_result}")
+    # One pooled client so every call after the first reuses the TLS connection
+    async with httpx.AsyncClient(http2=True, timeout=30.0) as client:
+        # Step 1: Create project
+        print("1️⃣ Creating project...")
+        project_name = "SecondOrderEffectsEngine"
+        
+        result = await create_project(client, project_name)
+        
+        if result.get('success'):
+            project_id = result['projects'][0]['projectId']
+            print(f"   ✅ Project created: {project_name} (ID: {project_id})\n")
+        else:
+            print(f"   ❌ Error: {result.get('errors', result)}")
+            return
+        
+        # Step 2: Read and upload the algorithm files concurrently
+        print("2️⃣ Uploading algorithm...")
+        
+        # Project file name -> local path
+        files = [("main.py", "second_order_algo.py")]
+        file_results = await asyncio.gather(
+            *[upload_file(client, project_id, name, path) for name, path in files]
+        )
+        
+        for (name, _), file_result in zip(files, file_results):
+            if file_result.get('success'):
+                print(f"   ✅ Uploaded {name} successfully!\n")
+            else:
+                print(f"   ❌ Error uploading {name}: {file_result}")
+        
+        # Step 3: Compile
+        print("3️⃣ Compiling project...")
+        compile_result = await compile_project(client, project_id)
+        
+        if compile_result.get('success'):
+            print(f"   ✅ Compilation successful!\n")
+            print(f"   Compile ID: {compile_result.get('compileId')}")
+        else:
+            print(f"   ⚠️ Compilation issues: {compile_result}")
     
     print("\n✨ Project setup complete!")
     print(f"   📊 Project URL: https://www.quantconnect.com/project/{project_id}")
     print("   🎯 Next: Run a backtest to see second-order effects in action!")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
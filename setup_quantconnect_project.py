@@ -5,209 +5,365 @@ This script creates the project and uploads the algorithm
 """
 
 import os
-import sys
 import asyncio
-import httpx
+import logging
 from pathlib import Path
 
-# Add the quantconnect_mcp module to path
-sys.path.insert(0, '/Users/schmoll/Documents/GitHub/quantconnect-mcp')
+import aiofiles
+import orjson
 
-from quantconnect_mcp.src.auth.quantconnect_auth import QuantConnectAuth
-from quantconnect_mcp.src.tools.project_tools import (
-    create_project, 
-    read_project,
-    compile_project
-)
-from quantconnect_mcp.src.tools.file_tools import create_file, update_file_content
+from quantconnect_mcp.src.auth.quantconnect_auth import QuantConnectAuth, close_client
+from quantconnect_mcp.src.utils import run_event_loop
 
-# Set up authentication
-os.environ['QUANTCONNECT_USER_ID'] = '388061'
-os.environ['QUANTCONNECT_API_TOKEN'] = 'e574cead7d73e1535172727fb546dca754b0a879c33a847e0e08695d4fb433e2'
-os.environ['QUANTCONNECT_ORGANIZATION_ID'] = '15de91db32c751751a6898c844fb6b0f'
+logger = logging.getLogger(__name__)
 
-async def setup_second_order_project():
-    """Create and configure the second-order effects project"""
-    
-    print("🚀 Setting up Second-Order Effects Trading System in QuantConnect\n")
-    
-    # Initialize auth
-    auth = QuantConnectAuth()
-    
-    # Step 1: Create the project
-    print("1️⃣ Creating QuantConnect project...")
-    project_name = "SecondOrderEffectsEngine"
-    
-    try:
-        # Create project
-        result = await create_project(
-            name=project_name,
-            language="Python"
-        )
-        
-        if result['success']:
-            project_id = result['projectId']
-            print(f"   ✅ Project created: {project_name} (ID: {project_id})\n")
-        else:
-            # Project might already exist, try to find it
-            projects = await read_project()
-            for proj in projects.get('projects', []):
-                if proj['name'] == project_name:
-                    project_id = proj['projectId']
-                    print(f"   ℹ️ Project already exists: {project_name} (ID: {project_id})\n")
-                    break
-    except Exception as e:
-        print(f"   ❌ Error creating project: {e}")
-        return
+# Repository root, where this script and the algorithm live
+REPO_ROOT = Path(__file__).resolve().parent
+
+# Supply chain mapper helper module uploaded alongside the algorithm
+_SUPPLY_CHAIN_SRC = '''# Supply Chain and Relationship Mapper
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, FrozenSet, Set, Tuple
+
+# Extended supply chain database
+_RAW = {
+    # Tech Giants
+    "AAPL": {
+        "suppliers": ["QCOM", "SWKS", "AVGO", "QRVO", "TSM", "HON", "STX"],
+        "customers": ["VZ", "T", "TMUS"],
+        "competitors": ["GOOGL", "MSFT", "SSNLF"],
+        "ecosystem": ["UBER", "LYFT", "SQ", "SHOP"]
+    },
     
-    # Step 2: Upload the algorithm
-    print("2️⃣ Uploading second-order algorithm...")
+    # Electric Vehicles
+    "TSLA": {
+        "suppliers": ["PANW", "ALB", "LAC", "LTHM", "NVDA", "STM"],
+        "competitors": ["F", "GM", "RIVN", "LCID", "NIO", "XPEV"],
+        "infrastructure": ["CHPT", "BLNK", "EVGO"],
+        "battery": ["QS", "SLDP", "MVST"]
+    },
     
-    # Read the algorithm file
-    algo_path = Path('/Users/schmoll/Documents/GitHub/quantconnect-mcp/second_order_algo.py')
-    with open(algo_path, 'r') as f:
-        algo_content = f.read()
+    # Semiconductors
+    "NVDA": {
+        "suppliers": ["TSM", "ASML", "AMAT", "LRCX", "KLAC"],
+        "customers": ["MSFT", "GOOGL", "AMZN", "META", "TSLA"],
+        "competitors": ["AMD", "INTC", "QCOM"],
+        "related": ["SMCI", "DELL", "HPE"]
+    },
     
-    try:
-        # Create main.py file
-        result = await create_file(
-            project_id=project_id,
-            name="main.py",
-            content=algo_content
-        )
-        print(f"   ✅ Algorithm uploaded to main.py\n")
-    except:
-        # File might exist, update it
-        result = await update_file_content(
-            project_id=project_id,
-            name="main.py",
-            content=algo_content
-        )
-        print(f"   ✅ Algorithm updated in main.py\n")
-    
-    # Step 3: Create helper files
-    print("3️⃣ Creating helper modules...")
-    
-    # Create supply chain mapper
-    supply_chain_content = '''# Supply Chain and Relationship Mapper
-import json
-from typing import Dict, List, Set
+    # Cloud/AI
+    "MSFT": {
+        "partners": ["NVDA", "AMD", "ORCL"],
+        "competitors": ["AMZN", "GOOGL", "CRM"],
+        "ecosystem": ["ADBE", "NOW", "TEAM", "DOCU"],
+        "hardware": ["DELL", "HPQ", "NTAP"]
+    }
+}
+
+# Impact weights by relationship type
+_WEIGHTS = {
+    "suppliers": 0.7,
+    "customers": 0.6,
+    "competitors": 0.5,
+    "ecosystem": 0.4,
+    "infrastructure": 0.6,
+    "partners": 0.8
+}
+
+# Event type -> (positively affected, negatively affected) relationship types
+_EVENT_DISPATCH = {
+    "earnings_beat": ("suppliers", "competitors"),
+    "supply_disruption": ("competitors", "customers"),
+    "innovation": ("ecosystem", "competitors")
+}
 
 class SupplyChainMapper:
     """Maps company relationships for second-order effect detection"""
     
     def __init__(self):
-        # Extended supply chain database
+        # Frozensets give O(1) membership tests on related tickers; interned
+        # symbols are shared across primaries and compare by identity
         self.relationships = {
-            # Tech Giants
-            "AAPL": {
-                "suppliers": ["QCOM", "SWKS", "AVGO", "QRVO", "TSM", "HON", "STX"],
-                "customers": ["VZ", "T", "TMUS"],
-                "competitors": ["GOOGL", "MSFT", "SSNLF"],
-                "ecosystem": ["UBER", "LYFT", "SQ", "SHOP"]
-            },
-            
-            # Electric Vehicles
-            "TSLA": {
-                "suppliers": ["PANW", "ALB", "LAC", "LTHM", "NVDA", "STM"],
-                "competitors": ["F", "GM", "RIVN", "LCID", "NIO", "XPEV"],
-                "infrastructure": ["CHPT", "BLNK", "EVGO"],
-                "battery": ["QS", "SLDP", "MVST"]
-            },
-            
-            # Semiconductors
-            "NVDA": {
-                "suppliers": ["TSM", "ASML", "AMAT", "LRCX", "KLAC"],
-                "customers": ["MSFT", "GOOGL", "AMZN", "META", "TSLA"],
-                "competitors": ["AMD", "INTC", "QCOM"],
-                "related": ["SMCI", "DELL", "HPE"]
-            },
-            
-            # Cloud/AI
-            "MSFT": {
-                "partners": ["NVDA", "AMD", "ORCL"],
-                "competitors": ["AMZN", "GOOGL", "CRM"],
-                "ecosystem": ["ADBE", "NOW", "TEAM", "DOCU"],
-                "hardware": ["DELL", "HPQ", "NTAP"]
+            sys.intern(primary): {
+                sys.intern(rel): frozenset(sys.intern(t) for t in tickers)
+                for rel, tickers in rels.items()
             }
+            for primary, rels in _RAW.items()
         }
+        
+        # Reverse index: affected ticker -> ((primary, relationship type), ...),
+        # frozen to tuples so callers can't modify it
+        reverse = defaultdict(list)
+        for primary, rels in self.relationships.items():
+            for rel_type, tickers in rels.items():
+                for ticker in tickers:
+                    reverse[ticker].append((primary, rel_type))
+        self._reverse = {ticker: tuple(pairs) for ticker, pairs in reverse.items()}
+    
+    def who_affects(self, ticker: str) -> Tuple[Tuple[str, str], ...]:
+        """Get the (primary ticker, relationship type) pairs that affect a ticker"""
+        
+        return self._reverse.get(ticker, ())
     
-    def get_affected_tickers(self, primary_ticker: str, event_type: str) -> Dict[str, List[str]]:
+    def get_affected_tickers(self, primary_ticker: str, event_type: str) -> Dict[str, FrozenSet[str]]:
         """Get all tickers affected by an event on the primary ticker"""
         
         if primary_ticker not in self.relationships:
             return {}
         
-        affected = {}
-        base_relations = self.relationships[primary_ticker]
-        
-        # Determine impact based on event type
-        if "earnings_beat" in event_type.lower():
-            affected["positive"] = base_relations.get("suppliers", [])
-            affected["negative"] = base_relations.get("competitors", [])
-            
-        elif "supply_disruption" in event_type.lower():
-            affected["negative"] = base_relations.get("customers", [])
-            affected["positive"] = base_relations.get("competitors", [])
-            
-        elif "innovation" in event_type.lower():
-            affected["positive"] = base_relations.get("ecosystem", [])
-            affected["negative"] = base_relations.get("competitors", [])
+        # Single lookup of the canonical event tag; unknown events affect nothing
+        keys = _EVENT_DISPATCH.get(event_type.lower())
+        if keys is None:
+            return {}
         
-        return affected
+        positive, negative = keys
+        base_relations = self.relationships[primary_ticker]
+        empty = frozenset()
+        return {
+            "positive": base_relations.get(positive, empty),
+            "negative": base_relations.get(negative, empty)
+        }
     
     def calculate_impact_score(self, primary_ticker: str, affected_ticker: str, 
                               relationship_type: str) -> float:
         """Calculate the expected impact magnitude (0-1)"""
         
-        # Impact weights by relationship type
-        weights = {
-            "suppliers": 0.7,
-            "customers": 0.6,
-            "competitors": 0.5,
-            "ecosystem": 0.4,
-            "infrastructure": 0.6,
-            "partners": 0.8
-        }
-        
-        return weights.get(relationship_type, 0.3)
+        return _WEIGHTS.get(relationship_type, 0.3)
 '''
+
+class JSONString(bytes):
+    """Text already encoded as a JSON string literal, quotes included"""
+
+# The mapper source encoded once, ready to splice into uploads
+_SUPPLY_CHAIN_JSON = JSONString(orjson.dumps(_SUPPLY_CHAIN_SRC))
+
+COMPILE_DONE_STATES = {"BuildSuccess", "BuildError"}
+MAX_CONCURRENT_UPLOADS = 8
+
+async def api_post(auth, endpoint, payload=None, retries=5, body=None):
+    """POST to the QuantConnect API over the auth's shared, pooled client
+    
+    Pass `body` instead of `payload` to send a pre-encoded request: a callable
+    returning the JSON bytes or a fresh async iterable of them, called once
+    per attempt so streamed bodies can be retried.
+    """
+    delay = 1.0
+    for attempt in range(retries + 1):
+        if body is not None:
+            response = await auth.make_authenticated_request(endpoint, method="POST", content=body())
+        else:
+            response = await auth.make_authenticated_request(endpoint, method="POST", json=payload)
+        if response.status_code != 429 or attempt == retries:
+            break
+        
+        # Rate limited: wait as long as the API asks, else back off exponentially
+        retry_after = response.headers.get("Retry-After", "")
+        await asyncio.sleep(float(retry_after) if retry_after.isdigit() else delay)
+        delay *= 2
+
+    logger.debug("   [debug] %s -> %s over %s", endpoint, response.status_code, response.http_version)
+
+    # Surface auth failures, rate limits and server errors instead of parsing them
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def create_project(auth, name, language="Py"):
+    return await api_post(auth, "projects/create", {
+        "name": name,
+        "language": language,
+        "organizationId": auth.organization_id
+    })
+
+async def read_project(auth):
+    return await api_post(auth, "projects/read", {})
+
+async def stream_json_file(fields, path, chunk_size=65536):
+    """Yield `fields` as a JSON object whose "content" key holds the text of `path`"""
+    yield orjson.dumps(fields)[:-1] + b',"content":"'
+    async with aiofiles.open(path, "r", encoding="utf-8") as f:
+        while chunk := await f.read(chunk_size):
+            # JSON-escape the chunk; orjson wraps it in quotes, which are dropped
+            yield orjson.dumps(chunk)[1:-1]
+    yield b'"}'
+
+async def post_file(auth, endpoint, project_id, name, content):
+    """Send file content given as text, a Path to stream from disk, or a
+    JSONString spliced into the body without re-encoding
+    """
+    fields = {"projectId": project_id, "name": name}
+    if isinstance(content, Path):
+        return await api_post(auth, endpoint, body=lambda: stream_json_file(fields, content))
+    if isinstance(content, JSONString):
+        data = orjson.dumps(fields)[:-1] + b',"content":' + content + b'}'
+        return await api_post(auth, endpoint, body=lambda: data)
+    if not isinstance(content, str):
+        raise TypeError(f"File content must be str, Path or JSONString, not {type(content).__name__}")
+    return await api_post(auth, endpoint, {**fields, "content": content})
+
+async def create_file(auth, project_id, name, content):
+    return await post_file(auth, "files/create", project_id, name, content)
+
+async def update_file_content(auth, project_id, name, content):
+    return await post_file(auth, "files/update", project_id, name, content)
+
+async def list_project_files(auth, project_id):
+    result = await api_post(auth, "files/read", {"projectId": project_id})
+    return result.get('files', [])
+
+async def compile_project(auth, project_id):
+    return await api_post(auth, "compile/create", {"projectId": project_id})
+
+async def read_compile(auth, project_id, compile_id):
+    return await api_post(auth, "compile/read", {"projectId": project_id, "compileId": compile_id})
+
+async def wait_for_compile(auth, project_id, compile_id, timeout=60.0):
+    """Poll a compile until it finishes, backing off from 100 ms to 2 s"""
+    async def poll():
+        delay = 0.1
+        while True:
+            status = await read_compile(auth, project_id, compile_id)
+            if status.get('state') in COMPILE_DONE_STATES:
+                return status
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+    
+    return await asyncio.wait_for(poll(), timeout)
+
+async def upsert_file(auth, project_id, name, content, existing_files):
+    """Update a file the project already has, otherwise create it"""
+    if name in existing_files:
+        result = await update_file_content(auth, project_id, name, content)
+        action = "Updated"
+    else:
+        result = await create_file(auth, project_id, name, content)
+        action = "Uploaded"
+    
+    if result.get('success'):
+        logger.info("   ✅ %s %s", action, name)
+    else:
+        logger.error("   ❌ Failed to upload %s: %s", name, result.get('errors', result))
+    return result
+
+async def setup_second_order_project():
+    """Create and configure the second-order effects project
+    
+    Must be awaited on a running event loop (e.g. from Jupyter); all file
+    I/O is async, so it never stalls other tasks. Use main() from sync code.
+    """
+    assert asyncio.get_running_loop()
     
+    logger.info("🚀 Setting up Second-Order Effects Trading System in QuantConnect")
+    
+    # Initialize auth; all API calls share one pooled HTTP client
+    auth = QuantConnectAuth()
     try:
-        result = await create_file(
-            project_id=project_id,
-            name="supply_chain_mapper.py",
-            content=supply_chain_content
-        )
-        print(f"   ✅ Created supply_chain_mapper.py\n")
-    except:
-        result = await update_file_content(
-            project_id=project_id,
-            name="supply_chain_mapper.py",
-            content=supply_chain_content
-        )
-        print(f"   ✅ Updated supply_chain_mapper.py\n")
-    
-    # Step 4: Compile the project
-    print("4️⃣ Compiling project...")
+        return await _setup_project(auth)
+    finally:
+        await close_client()
+
+async def _setup_project(auth):
+    """Run the setup steps with an authenticated API client"""
+    
+    # The algorithm is streamed from disk during upload, never read whole
+    algo_path = REPO_ROOT / 'second_order_algo.py'
+    
+    # Step 1: Create the project
+    logger.info("1️⃣ Creating QuantConnect project...")
+    project_name = "SecondOrderEffectsEngine"
+    
+    # Create the project and list existing ones concurrently, so a re-run
+    # that finds the project already exists costs no extra round trip
+    project_id = None
+    result, projects = await asyncio.gather(
+        create_project(auth, project_name),
+        read_project(auth),
+        return_exceptions=True
+    )
+
+    if not isinstance(result, BaseException) and result.get('success'):
+        project_id = result['projects'][0]['projectId']
+        logger.info("   ✅ Project created: %s (ID: %s)", project_name, project_id)
+    elif not isinstance(projects, BaseException):
+        # Project might already exist; the API has no name filter, so index
+        # the listing by name once
+        project_ids = {proj['name']: proj['projectId'] for proj in projects.get('projects', [])}
+        project_id = project_ids.get(project_name)
+        if project_id is not None:
+            logger.info("   ℹ️ Project already exists: %s (ID: %s)", project_name, project_id)
+
+    if project_id is None:
+        error = result if isinstance(result, BaseException) else result.get('errors', result)
+        logger.error("   ❌ Error creating project: %s", error)
+        return
+    
+    # Step 2: Upload the algorithm and helper modules
+    logger.info("2️⃣ Uploading second-order algorithm and helper modules...")
+    
+    # One file listing decides create vs update for every upload
+    existing_files = {f['name'] for f in await list_project_files(auth, project_id)}
+    
+    files = [
+        ("main.py", algo_path),
+        ("supply_chain_mapper.py", _SUPPLY_CHAIN_JSON)
+    ]
+    
+    # Upload files concurrently, but never more than MAX_CONCURRENT_UPLOADS
+    # at once so a growing file list doesn't trip QuantConnect's rate limit
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+    
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+    
+    await asyncio.gather(*(
+        bounded(upsert_file(auth, project_id, name, content, existing_files))
+        for name, content in files
+    ))
+    
+    # Step 3: Compile the project
+    logger.info("3️⃣ Compiling project...")
     try:
-        compile_result = await compile_project(project_id=project_id)
+        compile_result = await compile_project(auth, project_id)
         if compile_result.get('success'):
-            print(f"   ✅ Project compiled successfully!\n")
-            print(f"   Compile ID: {compile_result.get('compileId')}")
+            # compile/create only queues the build; wait for it to finish
+            compile_id = compile_result.get('compileId')
+            status = await wait_for_compile(auth, project_id, compile_id)
+            if status['state'] == "BuildSuccess":
+                logger.info("   ✅ Project compiled successfully!")
+                logger.info("   Compile ID: %s", compile_id)
+            else:
+                logger.warning("   ⚠️ Compilation failed: %s", status.get('logs', status))
         else:
-            print(f"   ⚠️ Compilation had issues: {compile_result}")
+            logger.warning("   ⚠️ Compilation had issues: %s", compile_result)
+    except asyncio.TimeoutError:
+        logger.warning("   ⚠️ Compilation still running after 60s, check its status on QuantConnect")
     except Exception as e:
-        print(f"   ❌ Compilation error: {e}")
+        logger.error("   ❌ Compilation error: %s", e)
     
-    print("\n✨ Setup complete! Next steps:")
-    print("   1. Go to QuantConnect.com and open your project")
-    print(f"   2. Project name: {project_name}")
-    print("   3. Run a backtest to see second-order effects in action")
-    print("   4. Connect your IBKR/Alpaca accounts for live trading")
+    logger.info("✨ Setup complete! Next steps:")
+    logger.info("   1. Go to QuantConnect.com and open your project")
+    logger.info("   2. Project name: %s", project_name)
+    logger.info("   3. Run a backtest to see second-order effects in action")
+    logger.info("   4. Connect your IBKR/Alpaca accounts for live trading")
     
     return project_id
 
+def main():
+    """Run the setup on a fresh event loop, using uvloop when available"""
+    return run_event_loop(setup_second_order_project())
+
 if __name__ == "__main__":
-    # Run the setup
-    asyncio.run(setup_second_order_project())
+    # Set up authentication
+    os.environ['QUANTCONNECT_USER_ID'] = '388061'
+    os.environ['QUANTCONNECT_API_TOKEN'] = 'e574cead7d73e1535172727fb546dca754b0a879c33a847e0e08695d4fb433e2'
+    os.environ['QUANTCONNECT_ORGANIZATION_ID'] = '15de91db32c751751a6898c844fb6b0f'
+    
+    # Progress goes to stderr as plain messages; QC_DEBUG adds per-request detail
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if os.environ.get('QC_DEBUG'):
+        logger.setLevel(logging.DEBUG)
+    
+    main()
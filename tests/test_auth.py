@@ -2,19 +2,31 @@
 
 import pytest
 import sys
+from base64 import b64encode
+from hashlib import sha256
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from src.auth import quantconnect_auth
 from src.auth.quantconnect_auth import (
     QuantConnectAuth,
+    close_auth,
     configure_auth,
     get_auth_instance,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_client():
+    """Give each test a fresh shared HTTP client."""
+    quantconnect_auth._client = None
+    yield
+    quantconnect_auth._client = None
+
+
 class TestQuantConnectAuth:
     """Test QuantConnect authentication functionality."""
 
@@ -73,6 +85,22 @@ class TestQuantConnectAuth:
         assert timestamp.isdigit()
         assert len(timestamp) == 10  # Unix timestamp should be 10 digits
 
+    def test_get_headers_signed_once_per_second(self):
+        """Test that headers are re-signed only when the timestamp changes."""
+        auth = QuantConnectAuth(user_id="123456", api_token="test_token")
+
+        with patch("src.auth.quantconnect_auth.time", side_effect=[1700000000.1, 1700000000.9, 1700000001.0]):
+            first = auth.get_headers()
+            second = auth.get_headers()
+            third = auth.get_headers()
+
+        digest = sha256(b"test_token:1700000000").hexdigest()
+        expected = b64encode(f"123456:{digest}".encode()).decode("ascii")
+        assert first["Authorization"] == f"Basic {expected}"
+        assert second == first and second is not first
+        assert third["Timestamp"] == "1700000001"
+        assert third["Authorization"] != first["Authorization"]
+
     def test_configure_auth_global(self):
         """Test global authentication configuration."""
         auth = configure_auth(
@@ -98,9 +126,7 @@ class TestAuthenticationAPI:
             mock_response.status_code = 200
             mock_response.json = AsyncMock(return_value={"success": True})
 
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             is_valid, message = await auth.validate_authentication()
 
@@ -116,14 +142,63 @@ class TestAuthenticationAPI:
             mock_response = AsyncMock()
             mock_response.status_code = 200
 
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
             response = await auth.make_authenticated_request("test_endpoint", "GET")
 
             assert response is not None
 
+    async def test_requests_share_one_client(self):
+        """Test that authenticated requests reuse the same pooled client."""
+        auth = QuantConnectAuth(user_id="123456", api_token="test_token")
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.is_closed = False
+            mock_client.return_value.get = AsyncMock()
+            mock_client.return_value.aclose = AsyncMock()
+
+            await auth.make_authenticated_request("first", "GET")
+            await auth.make_authenticated_request("second", "GET")
+
+            assert mock_client.call_count == 1
+            assert mock_client.return_value.get.await_count == 2
+
+            await close_auth()
+            mock_client.return_value.aclose.assert_awaited_once()
+
+    async def test_json_body_serialized_with_orjson(self):
+        """Test that JSON payloads are sent as pre-encoded orjson bytes."""
+        auth = QuantConnectAuth(user_id="123456", api_token="test_token")
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.post = AsyncMock()
+
+            await auth.make_authenticated_request(
+                "files/create", "POST", json={"projectId": 1, "name": "main.py"}
+            )
+
+            kwargs = mock_client.return_value.post.await_args.kwargs
+            assert kwargs["content"] == b'{"projectId":1,"name":"main.py"}'
+            assert kwargs["headers"]["Content-Type"] == "application/json"
+
+    async def test_instances_share_one_client(self):
+        """Test that reconfiguring reuses the client and clearing closes it once."""
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.is_closed = False
+            mock_client.return_value.aclose = AsyncMock()
+
+            first = configure_auth(user_id="123456", api_token="test_token")
+            second = configure_auth(user_id="123456", api_token="new_token")
+
+            assert first.client is second.client
+            assert mock_client.call_count == 1
+            mock_client.return_value.aclose.assert_not_awaited()
+
+            await close_auth()
+
+            assert get_auth_instance() is None
+            mock_client.return_value.aclose.assert_awaited_once()
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,97 @@
+"""Tests for the AI Second-Order Effects Detector"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add the repository root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from second_order_ai import SecondOrderAI
+
+
+def make_entity(ticker, confidence, magnitude, relationship="supplier"):
+    """Build a second-order entity as returned by the mapping prompt."""
+    return {
+        "ticker": ticker,
+        "relationship": relationship,
+        "impact_direction": "positive",
+        "impact_magnitude": magnitude,
+        "time_lag_days": 3,
+        "confidence": confidence,
+        "rationale": f"{ticker} rationale",
+    }
+
+
+class TestGenerateTradeSignals:
+    """Test trade signal ranking and strategy selection."""
+
+    async def test_tied_scores_keep_original_order(self):
+        """Test that entities with equal scores rank in their original order."""
+        entities = [make_entity(f"T{i:02d}", 0.9, 0.5) for i in range(8)]
+        entities += [make_entity(f"H{i:02d}", 0.9, 0.8) for i in range(3)]
+        entities += [make_entity(f"U{i:02d}", 0.7, 0.5) for i in range(4)]
+        second_order_map = {"suppliers": entities[:6], "competitors": entities[6:]}
+
+        async with SecondOrderAI() as ai:
+            signals = await ai.generate_trade_signals(second_order_map)
+
+        ordered = [e for entities in second_order_map.values() for e in entities]
+        expected = sorted(
+            ordered, key=lambda e: e["confidence"] * e["impact_magnitude"], reverse=True
+        )[:10]
+        assert [s["ticker"] for s in signals] == [e["ticker"] for e in expected]
+
+    async def test_low_confidence_entities_filtered(self):
+        """Test that entities at or below the confidence threshold are dropped."""
+        second_order_map = {"suppliers": [make_entity("LOW", 0.6, 0.9)]}
+
+        async with SecondOrderAI() as ai:
+            assert await ai.generate_trade_signals(second_order_map) == []
+
+
+class TestCachedQuery:
+    """Test response caching and sharing of in-flight requests."""
+
+    async def test_cancelled_caller_does_not_cancel_waiters(self):
+        """Test that cancelling the first caller leaves identical callers running."""
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch(prompt):
+            calls.append(prompt)
+            await release.wait()
+            return {"answer": prompt}
+
+        async with SecondOrderAI() as ai:
+            leader = asyncio.create_task(ai._cached_query("key", fetch, "p"))
+            follower = asyncio.create_task(ai._cached_query("key", fetch, "p"))
+            await asyncio.sleep(0)
+
+            leader.cancel()
+            await asyncio.sleep(0)
+            release.set()
+
+            assert await follower == {"answer": "p"}
+            assert leader.cancelled()
+            assert calls == ["p"]
+
+    async def test_cache_hit_returns_parsed_response(self):
+        """Test that a cache hit returns the cached dict without fetching again."""
+        calls = []
+
+        async def fetch(prompt):
+            calls.append(prompt)
+            return {"entities": [prompt]}
+
+        async with SecondOrderAI() as ai:
+            first = await ai._cached_query("key", fetch, "p")
+            second = await ai._cached_query("key", fetch, "p")
+
+            assert second is first
+            assert calls == ["p"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
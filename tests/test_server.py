@@ -39,6 +39,8 @@ class TestQuantConnectMCPServer:
             "seaborn",
             "arch",
             "statsmodels",
+            "httpx[http2]",
+            "orjson",
         ]
 
         for dep in expected_deps:
@@ -86,6 +88,31 @@ class TestMCPToolsStructure:
         assert callable(register_portfolio_tools)
         assert callable(register_universe_tools)
 
+    async def test_register_selected_toolsets(self):
+        """Test that only the requested toolsets are registered."""
+        from fastmcp import FastMCP
+        from src.tools import register_toolsets
+
+        server = FastMCP(name="Toolset Test Server")
+        registered = register_toolsets(server, "auth, project")
+
+        assert registered == ["auth", "project"]
+        tool_names = set((await server.get_tools()).keys())
+        assert "create_project" in tool_names
+        assert "create_file" not in tool_names
+
+        # Repeated names register each toolset once
+        server = FastMCP(name="Toolset Test Server")
+        assert register_toolsets(server, "project,auth,project") == ["project", "auth"]
+
+    async def test_register_unknown_toolset(self):
+        """Test that unknown toolset names are rejected."""
+        from fastmcp import FastMCP
+        from src.tools import register_toolsets
+
+        with pytest.raises(ValueError, match="Unknown toolsets"):
+            register_toolsets(FastMCP(name="Toolset Test Server"), "auth,nope")
+
     async def test_resources_can_be_registered(self):
         """Test that resources can be registered without errors."""
         from src.resources import register_system_resources